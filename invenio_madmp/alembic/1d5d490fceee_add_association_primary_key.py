@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2020 FAIR Data Austria.
+#
+# Invenio-maDMP is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Add primary key and reverse index to the DMP/dataset association."""
+
+import sqlalchemy as sa
+import sqlalchemy_utils
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "1d5d490fceee"
+down_revision = "be6715fe49e3"
+branch_labels = ()
+depends_on = None
+
+association = sa.table(
+    "dmp_datamanagementplan_dataset",
+    sa.column("dmp_id", sqlalchemy_utils.types.uuid.UUIDType()),
+    sa.column("dataset_id", sqlalchemy_utils.types.uuid.UUIDType()),
+)
+
+
+def upgrade():
+    """Upgrade database."""
+    # the table didn't have any constraints so far, so it may contain
+    # duplicate (and incomplete) rows that would violate the primary key
+    rows = (
+        op.get_bind()
+        .execute(
+            sa.select([association.c.dmp_id, association.c.dataset_id])
+            .where(association.c.dmp_id.isnot(None))
+            .where(association.c.dataset_id.isnot(None))
+            .distinct()
+        )
+        .fetchall()
+    )
+    op.execute(association.delete())
+    op.bulk_insert(
+        association,
+        [{"dmp_id": dmp_id, "dataset_id": ds_id} for dmp_id, ds_id in rows],
+    )
+
+    with op.batch_alter_table("dmp_datamanagementplan_dataset") as batch_op:
+        batch_op.alter_column(
+            "dmp_id",
+            existing_type=sqlalchemy_utils.types.uuid.UUIDType(),
+            nullable=False,
+        )
+        batch_op.alter_column(
+            "dataset_id",
+            existing_type=sqlalchemy_utils.types.uuid.UUIDType(),
+            nullable=False,
+        )
+        batch_op.create_primary_key(
+            "pk_dmp_datamanagementplan_dataset", ["dmp_id", "dataset_id"]
+        )
+        batch_op.create_index(
+            "ix_dmp_datamanagementplan_dataset_dataset_id_dmp_id",
+            ["dataset_id", "dmp_id"],
+        )
+
+
+def downgrade():
+    """Downgrade database."""
+    with op.batch_alter_table("dmp_datamanagementplan_dataset") as batch_op:
+        batch_op.drop_index("ix_dmp_datamanagementplan_dataset_dataset_id_dmp_id")
+        batch_op.drop_constraint("pk_dmp_datamanagementplan_dataset", type_="primary")
+        batch_op.alter_column(
+            "dataset_id",
+            existing_type=sqlalchemy_utils.types.uuid.UUIDType(),
+            nullable=True,
+        )
+        batch_op.alter_column(
+            "dmp_id",
+            existing_type=sqlalchemy_utils.types.uuid.UUIDType(),
+            nullable=True,
+        )
@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2020 FAIR Data Austria.
+#
+# Invenio-maDMP is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Create maDMP branch."""
+
+# revision identifiers, used by Alembic.
+revision = "7bb06c541360"
+down_revision = None
+branch_labels = ("invenio_madmp",)
+depends_on = "dbdbc1b19cf2"
+
+
+def upgrade():
+    """Upgrade database."""
+
+
+def downgrade():
+    """Downgrade database."""
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2020 FAIR Data Austria.
+#
+# Invenio-maDMP is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Create maDMP tables."""
+
+import sqlalchemy as sa
+import sqlalchemy_utils
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "be6715fe49e3"
+down_revision = "7bb06c541360"
+branch_labels = ()
+depends_on = "999c62899c20"
+
+
+def upgrade():
+    """Upgrade database."""
+    op.create_table(
+        "dmp_datamanagementplan",
+        sa.Column("id", sqlalchemy_utils.types.uuid.UUIDType(), nullable=False),
+        sa.Column("dmp_id", sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_dmp_datamanagementplan")),
+        sa.UniqueConstraint("dmp_id", name=op.f("uq_dmp_datamanagementplan_dmp_id")),
+    )
+    op.create_table(
+        "dmp_dataset",
+        sa.Column("id", sqlalchemy_utils.types.uuid.UUIDType(), nullable=False),
+        sa.Column("dataset_id", sa.String(), nullable=False),
+        sa.Column("record_pid_id", sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["record_pid_id"],
+            ["pidstore_pid.id"],
+            name=op.f("fk_dmp_dataset_record_pid_id_pidstore_pid"),
+        ),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_dmp_dataset")),
+        sa.UniqueConstraint("dataset_id", name=op.f("uq_dmp_dataset_dataset_id")),
+        sa.UniqueConstraint("record_pid_id", name=op.f("uq_dmp_dataset_record_pid_id")),
+    )
+    op.create_table(
+        "dmp_datamanagementplan_dataset",
+        sa.Column("dmp_id", sqlalchemy_utils.types.uuid.UUIDType(), nullable=True),
+        sa.Column("dataset_id", sqlalchemy_utils.types.uuid.UUIDType(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["dataset_id"],
+            ["dmp_dataset.id"],
+            name=op.f("fk_dmp_datamanagementplan_dataset_dataset_id_dmp_dataset"),
+        ),
+        sa.ForeignKeyConstraint(
+            ["dmp_id"],
+            ["dmp_datamanagementplan.id"],
+            name=op.f(
+                "fk_dmp_datamanagementplan_dataset_dmp_id_dmp_datamanagementplan"
+            ),
+        ),
+    )
+
+
+def downgrade():
+    """Downgrade database."""
+    op.drop_table("dmp_datamanagementplan_dataset")
+    op.drop_table("dmp_dataset")
+    op.drop_table("dmp_datamanagementplan")
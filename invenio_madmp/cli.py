@@ -9,7 +9,7 @@ from flask.cli import with_appcontext
 from invenio_db import db
 
 from .convert import convert_dmp
-from .models import DataManagementPlan
+from .models import DataManagementPlan, Dataset
 
 
 @click.group()
@@ -22,7 +22,10 @@ def madmp():
 @with_appcontext
 def madmp_list():
     """List all stored DMPs along with their datasets."""
-    for dmp in DataManagementPlan.query.all():
+    dmps = DataManagementPlan.query.all()
+    Dataset.load_records(ds for dmp in dmps for ds in dmp.datasets)
+
+    for dmp in dmps:
         click.echo("[DMP] %s" % dmp.dmp_id)
 
         for dataset in dmp.datasets:
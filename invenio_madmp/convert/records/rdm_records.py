@@ -20,7 +20,7 @@ from ...util import (
     translate_dataset_type,
     translate_license,
 )
-from ..util import filter_contributors, map_contact, map_contributor, map_creator
+from ..util import filter_contributors, map_contact, map_creators_and_contributors
 from .base import BaseRecordConverter
 
 
@@ -99,11 +99,12 @@ class RDMRecordConverter(BaseRecordConverter):
         if contact is None:
             contact = map_contact(contact_dict)
 
-        if contributors is None:
-            contributors = list(map(map_contributor, contributor_list))
-
-        if creators is None:
-            creators = list(map(map_creator, contributor_list))
+        if contributors is None or creators is None:
+            mapped_creators, mapped_contributors = map_creators_and_contributors(
+                contributor_list
+            )
+            creators = mapped_creators if creators is None else creators
+            contributors = mapped_contributors if contributors is None else contributors
 
         resource_type = self.map_resource_type(dataset_dict)
         access_right = self.map_access_right(distribution_dict)
@@ -113,16 +114,18 @@ class RDMRecordConverter(BaseRecordConverter):
         descriptions = [self.map_description(dataset_dict)]
         dates = []
 
-        min_lic_start = None
-        for lic in distribution_dict.get("license"):
-            lic_start = parse_date(lic["start_date"])
-
-            if min_lic_start is None or lic_start < min_lic_start:
-                min_lic_start = lic_start
+        lic_starts = [
+            parse_date(lic["start_date"])
+            for lic in distribution_dict.get("license") or []
+        ]
+        min_lic_start = min(lic_starts) if lic_starts else None
 
+        now = datetime.utcnow()
         record = {
             "access": {
                 "access_right": access_right,
+                "files_restricted": access_right != "open",
+                "metadata_restricted": False,
             },
             "metadata": {
                 "contact": contact,
@@ -134,25 +137,16 @@ class RDMRecordConverter(BaseRecordConverter):
                 "language": language,
                 "licenses": licenses,
                 "descriptions": descriptions,
-                "publication_date": datetime.utcnow().isoformat(),
+                "publication_date": now.isoformat(),
             },
         }
 
-        if min_lic_start is None or datetime.utcnow() < min_lic_start:
+        if min_lic_start is not None and now < min_lic_start:
             # the earliest license start date is in the future:
             # that means there's an embargo
             fmt_date = format_date(min_lic_start, "%Y-%m-%d")
             record["metadata"]["embargo_date"] = fmt_date
 
-        files_restricted = access_right != "open"
-        metadata_restricted = False
-        record["access"].update(
-            {
-                "files_restricted": files_restricted,
-                "metadata_restricted": metadata_restricted,
-            }
-        )
-
         # parse the record owners from the contributors (based on their roles)
         filtered_contribs = filter_contributors(contributor_list)
         if not filtered_contribs:
@@ -1,7 +1,7 @@
 """Utilities for mapping between maDMPs and Records."""
 
 
-from typing import List
+from typing import List, Tuple
 
 from flask import current_app as app
 from flask_principal import Identity
@@ -13,7 +13,7 @@ from ..models import DataManagementPlan as DMP
 from ..models import Dataset
 from ..util import (
     distribution_matches_us,
-    fetch_unassigned_record,
+    fetch_unassigned_records,
     is_identifier_type_allowed,
     translate_person_details,
 )
@@ -41,7 +41,7 @@ def map_contact(contact_dict):
     return contact_dict.get("mbox", app.config["MADMP_DEFAULT_CONTACT"])
 
 
-def map_creator(creator_dict):
+def map_creator(creator_dict, details=None):
     """Map the DMP's creator(s) to the record's creator(s)."""
     # TODO creator = uploader?
     cid = creator_dict["contributor_id"]
@@ -62,17 +62,18 @@ def map_creator(creator_dict):
         "affiliations": affiliations,
     }
 
+    if details is None:
+        details = translate_person_details(creator_dict)
+
     additional_details = {
-        k: v
-        for k, v in translate_person_details(creator_dict).items()
-        if k in creator.keys() and v is not None
+        k: v for k, v in details.items() if k in creator.keys() and v is not None
     }
     creator.update(additional_details)
 
     return {k: v for k, v in creator.items() if v is not None}
 
 
-def map_contributor(contributor_dict, role_idx=0):
+def map_contributor(contributor_dict, role_idx=0, details=None):
     """Map the DMP's contributor(s) to the record's contributor(s)."""
     cid = contributor_dict["contributor_id"]
     identifiers = (
@@ -95,45 +96,106 @@ def map_contributor(contributor_dict, role_idx=0):
         "role": contributor_dict["role"][role_idx],
     }
 
+    if details is None:
+        details = translate_person_details(contributor_dict)
+
     additional_details = {
-        k: v
-        for k, v in translate_person_details(contributor_dict).items()
-        if k in contributor.keys() and v is not None
+        k: v for k, v in details.items() if k in contributor.keys() and v is not None
     }
     contributor.update(additional_details)
 
     return {k: v for k, v in contributor.items() if v is not None}
 
 
-def matching_distributions(dataset_dict):
+def map_creators_and_contributors(
+    contrib_dict_list: List[dict],
+) -> Tuple[List[dict], List[dict]]:
+    """Map the DMP's contributors to the record's creators and contributors.
+
+    The person details are only translated once per contributor and shared
+    between both mappings.
+    """
+    creators, contributors = [], []
+    for contrib_dict in contrib_dict_list:
+        details = translate_person_details(contrib_dict)
+        creators.append(map_creator(contrib_dict, details=details))
+        contributors.append(map_contributor(contrib_dict, details=details))
+
+    return creators, contributors
+
+
+def matching_distributions(dataset_dict, host_url=None, host_title=None):
     """Fetch all matching distributions from the dataset."""
+    if host_url is None:
+        host_url = app.config["MADMP_HOST_URL"]
+    if host_title is None:
+        host_title = app.config["MADMP_HOST_TITLE"]
+
     return [
         dist
         for dist in dataset_dict.get("distribution", [])
-        if distribution_matches_us(dist)
+        if distribution_matches_us(dist, host_url, host_title)
     ]
 
 
 def convert_dmp(
-    madmp_dict: dict, hard_sync: bool = False, identity: Identity = None
+    madmp_dict: dict,
+    hard_sync: bool = False,
+    identity: Identity = None,
+    dmp: DMP = None,
 ) -> List:
-    """Map the maDMP's dictionary to a number of Invenio RDM Records."""
+    """Map the maDMP's dictionary to a number of Invenio RDM Records.
+
+    If the DMP has already been fetched (or created) by the caller, it can be
+    passed as ``dmp`` to avoid looking it up again.
+    """
     with db.session.no_autoflush:
         # disabling autoflush, because we don't want to flush unfinished parts
         # (this caused issues when Dataset.record_pid_id was not nullable)
         identity = identity or any_user
         contrib_list = madmp_dict.get("contributor", [])
         contact = map_contact(madmp_dict.get("contact", {}))
-        contribs = list(map(map_contributor, contrib_list))
-        creators = list(map(map_creator, contrib_list))
+        creators, contribs = map_creators_and_contributors(contrib_list)
         dmp_id = madmp_dict.get("dmp_id", {}).get("identifier")
 
-        found_dmp = DMP.get_by_dmp_id(dmp_id)
-        dmp = found_dmp or DMP(dmp_id=dmp_id)
-        old_datasets = dmp.datasets.copy()
-
-        for dataset in madmp_dict.get("dataset", []):
-            distribs = matching_distributions(dataset)
+        if dmp is None:
+            dmp = DMP.get_by_dmp_id(dmp_id) or DMP(dmp_id=dmp_id)
+
+        old_datasets = set(dmp.datasets)
+        dmp_dataset_ids = {ds.dataset_id for ds in dmp.datasets}
+
+        # fetch all the already known datasets in a single query
+        dataset_dicts = madmp_dict.get("dataset", [])
+        dataset_ids = [
+            ds_dict.get("dataset_id", {}).get("identifier") for ds_dict in dataset_dicts
+        ]
+        known_datasets = {
+            ds.dataset_id: ds
+            for ds in Dataset.query.filter(
+                Dataset.dataset_id.in_([i for i in dataset_ids if i is not None])
+            )
+        }
+        host_url = app.config["MADMP_HOST_URL"]
+        host_title = app.config["MADMP_HOST_TITLE"]
+        allow_multiple_distribs = app.config["MADMP_ALLOW_MULTIPLE_DISTRIBUTIONS"]
+        all_distribs = [
+            matching_distributions(ds_dict, host_url, host_title)
+            for ds_dict in dataset_dicts
+        ]
+
+        # look for existing records for all the datasets without records at once
+        Dataset.load_records(known_datasets.values())
+        unassigned_records = fetch_unassigned_records(
+            [
+                (dataset_id, distribs[0].get("access_url"))
+                for dataset_id, distribs in zip(dataset_ids, all_distribs)
+                if distribs
+                and dataset_id is not None
+                and getattr(known_datasets.get(dataset_id), "record", None) is None
+            ]
+        )
+
+        for dataset, distribs in zip(dataset_dicts, all_distribs):
             if not distribs:
                 # our repository is not listed as host for any
                 # of the distributions
@@ -158,7 +220,7 @@ def convert_dmp(
                 dataset_id = dataset.get("dataset_id", {}).get("identifier")
 
                 if len(distribs) > 1:
-                    if not app.config["MADMP_ALLOW_MULTIPLE_DISTRIBUTIONS"]:
+                    if not allow_multiple_distribs:
                         raise Exception(
                             (
                                 "dataset (%s) has multiple (%s) matching "
@@ -196,18 +258,17 @@ def convert_dmp(
 
                     records_and_converters.append((record_data, converter))
 
-                found_ds = Dataset.get_by_dataset_id(dataset_id)
+                found_ds = known_datasets.get(dataset_id)
                 ds = found_ds or Dataset(dataset_id=dataset_id)
-                if found_ds is not None and found_ds in old_datasets:
-                    old_datasets.remove(found_ds)
+                if found_ds is not None:
+                    old_datasets.discard(found_ds)
 
-                if ds.dataset_id not in [ds.dataset_id for ds in dmp.datasets]:
+                if ds.dataset_id not in dmp_dataset_ids:
                     dmp.datasets.append(ds)
+                    dmp_dataset_ids.add(ds.dataset_id)
 
                 if ds.record is None:
-                    record = fetch_unassigned_record(
-                        dataset_id, distribs[0].get("access_url")
-                    )
+                    record = unassigned_records.get(dataset_id)
                     if record is not None:
                         # TODO find better way of getting the "best" identifier
                         #      (e.g. first check for DOI, then whatever, and as
@@ -215,7 +276,7 @@ def convert_dmp(
                         #      note: the best would of course be the one
                         #            matching the dataset_id!
                         ds.record_pid = PID.query.filter(
-                            PID.object_uuid == record.id
+                            PID.object_type == "rec", PID.object_uuid == record.id
                         ).first()
                     else:
                         # create a new Draft
@@ -7,12 +7,15 @@
 
 """Invenio module for maDMP integration."""
 
+import hmac
 from datetime import datetime
 
 from flask_httpauth import HTTPTokenAuth
 
 from . import config
 
+_MADMP_KEYS = tuple(k for k in dir(config) if k.startswith("MADMP_"))
+
 
 class InvenioMaDMP(object):
     """Invenio-maDMP extension."""
@@ -37,19 +40,21 @@ class InvenioMaDMP(object):
 
     def init_config(self, app):
         """Initialize configuration."""
-        for k in dir(config):
-            if k.startswith("MADMP_"):
-                app.config.setdefault(k, getattr(config, k))
+        for k in _MADMP_KEYS:
+            app.config.setdefault(k, getattr(config, k))
 
     def set_up_rest_auth(self, app):
         """Set up the token verification for the REST endpoints."""
+        expected_token = app.config["MADMP_COMMUNICATION_TOKEN"]
+        if expected_token is not None:
+            expected_token = expected_token.encode("utf-8")
 
         @self.auth.verify_token
         def verify_token(token):
-            expected_token = app.config["MADMP_COMMUNICATION_TOKEN"]
             if expected_token is None:
                 return True
-            elif token == expected_token:
-                return True
+            elif token is None:
+                return False
 
-            return False
+            # compare in constant time, to not leak information via timing
+            return hmac.compare_digest(token.encode("utf-8"), expected_token)
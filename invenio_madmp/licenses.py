@@ -46,6 +46,8 @@ class License:
         if self.uri.endswith("/"):
             self.values_to_check.append(self.uri[:-1])
 
+        self.lowercase_values_to_check = {v.lower() for v in self.values_to_check}
+
     def matches(self, *str_values):
         """Check if the license matches any of the provided str_values.
 
@@ -55,11 +57,12 @@ class License:
         :return: True, if the license matches any of the provided values.
         :rtype: bool
         """
-        for val in (v.lower() for v in str_values):
-            if val in (v.lower() for v in self.values_to_check):
+        # fast path: maDMPs usually reference licenses by their exact identifier
+        for val in str_values:
+            if val == self.identifier or val == self.short_identifier:
                 return True
 
-        return False
+        return any(val.lower() in self.lowercase_values_to_check for val in str_values)
 
     def to_dict(self):
         """Generate an RDM-Records-compliant dictionary from the License.
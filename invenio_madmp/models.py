@@ -8,22 +8,86 @@
 """Database models for Data Management Plans."""
 
 import uuid
-from typing import List, Optional
+from typing import Iterable, List, Optional, Tuple
 
 from invenio_db import db
-from invenio_pidstore.models import PersistentIdentifier
+from invenio_pidstore.models import PersistentIdentifier, PIDStatus
 from invenio_rdm_records.models import BibliographicRecordDraft
 from invenio_records import Record
+from sqlalchemy import and_, event, inspect, or_
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm.exc import NoResultFound
+from sqlalchemy.orm import aliased, contains_eager
 from sqlalchemy_utils.types import UUIDType
 
-from .signals import dataset_changed, dmp_changed
+from .signals import dataset_changed, dmp_changed, send_after_commit
+
+
+def _get_pid_id(record_pid) -> Optional[int]:
+    """Get the ID of the given PID (or PID ID), or None if it can't be one."""
+    if isinstance(record_pid, PersistentIdentifier):
+        return record_pid.id
+
+    try:
+        return int(record_pid)
+    except (TypeError, ValueError):
+        return None
+
+
+def _record_conditions(record_uuid, alias: bool = False):
+    """Create the conditions for the record with the given UUID to exist.
+
+    The record may be either a published record or a draft, and it doesn't
+    count as existing if it has been (soft-) deleted.
+    Returns a (model, condition) pair for each of the record models, where the
+    models are aliased if requested (e.g. for joining them).
+    """
+    for api_cls in (Record, BibliographicRecordDraft):
+        model = aliased(api_cls.model_cls) if alias else api_cls.model_cls
+        yield model, and_(model.id == record_uuid, model.json.isnot(None))
+
+
+def _is_deleted(record: Record) -> bool:
+    """Check if the (previously loaded) record has been deleted since."""
+    state = inspect(record.model)
+    if state.deleted or state.was_deleted:
+        # the record has been deleted for good
+        return True
+
+    # soft-deleted records keep their row, but lose their JSON
+    return record.model.json is None
+
+
+def _as_list(items, item_cls) -> list:
+    """Get the items as a list, even if only a single item (or None) is given."""
+    if not items:
+        return []
+    elif isinstance(items, item_cls):
+        # if the argument is a single item, put it in a new list
+        return [items]
+
+    return items
+
 
 datamanagementplan_dataset = db.Table(
     "dmp_datamanagementplan_dataset",
-    db.Column("dmp_id", UUIDType, db.ForeignKey("dmp_datamanagementplan.id")),
-    db.Column("dataset_id", UUIDType, db.ForeignKey("dmp_dataset.id")),
+    db.Column(
+        "dmp_id",
+        UUIDType,
+        db.ForeignKey("dmp_datamanagementplan.id"),
+        primary_key=True,
+    ),
+    db.Column(
+        "dataset_id",
+        UUIDType,
+        db.ForeignKey("dmp_dataset.id"),
+        primary_key=True,
+    ),
+    # the primary key covers lookups by DMP, this one covers lookups by dataset
+    db.Index(
+        "ix_dmp_datamanagementplan_dataset_dataset_id_dmp_id",
+        "dataset_id",
+        "dmp_id",
+    ),
 )
 
 
@@ -51,22 +115,81 @@ class DataManagementPlan(db.Model):
     )
     """The dmp_id used to identify the DMP in the DMP tool."""
 
+    # the datasets are practically always used when DMPs are loaded (e.g. for
+    # listing), so we load them for all DMPs of a query in one go
     datasets = db.relationship(
-        "Dataset", secondary=datamanagementplan_dataset, back_populates="dmps"
+        "Dataset",
+        secondary=datamanagementplan_dataset,
+        back_populates="dmps",
+        lazy="selectin",
     )
 
+    def has_dataset(self, dataset: "Dataset") -> bool:
+        """Check if the dataset is part of this DMP."""
+        # note: adding or removing the dataset needs the loaded collection
+        #       anyway, so there's no point in checking via a separate query
+        return dataset in self.datasets
+
     def add_dataset(self, dataset: "Dataset", emit_signal=True):
-        """TODO."""
+        """Add the dataset to this DMP, if it isn't part of it yet."""
+        if self.has_dataset(dataset):
+            return
+
         self.datasets.append(dataset)
         if emit_signal:
-            dmp_changed.send(self, new_dataset=dataset)
-        # TODO emit signal, like in the setter of Dataset.record
+            send_after_commit(dmp_changed, self, new_dataset=dataset)
+
+    def remove_dataset(self, dataset: "Dataset", emit_signal=True):
+        """Remove the dataset from this DMP, if it is part of it."""
+        if not self.has_dataset(dataset):
+            return
+
+        self.datasets.remove(dataset)
+        if emit_signal:
+            send_after_commit(dmp_changed, self, removed_dataset=dataset)
+
+    def add_datasets(self, datasets: Iterable["Dataset"], emit_signal=True):
+        """Add all the datasets that aren't part of this DMP yet."""
+        members = set(self.datasets)
+        new_datasets = []
+        for dataset in datasets:
+            if dataset not in members:
+                members.add(dataset)
+                new_datasets.append(dataset)
+
+        self.datasets.extend(new_datasets)
+        if emit_signal and new_datasets:
+            send_after_commit(dmp_changed, self, new_datasets=new_datasets)
+
+    def remove_datasets(self, datasets: Iterable["Dataset"], emit_signal=True):
+        """Remove all the datasets that are part of this DMP."""
+        members = set(self.datasets)
+        removed_datasets = []
+        for dataset in datasets:
+            if dataset in members:
+                members.remove(dataset)
+                removed_datasets.append(dataset)
+
+        for dataset in removed_datasets:
+            self.datasets.remove(dataset)
+
+        if emit_signal and removed_datasets:
+            send_after_commit(dmp_changed, self, removed_datasets=removed_datasets)
 
     def delete(self, commit=True):
         """Delete the DMP, but do not delete the datasets."""
-        for ds in self.datasets:
-            ds.dmps.remove(self)
+        db.session.execute(
+            datamanagementplan_dataset.delete().where(
+                datamanagementplan_dataset.c.dmp_id == self.id
+            )
+        )
+        # the association rows are gone already, so the ORM must not try to
+        # delete them again based on the (possibly loaded) collections
+        if "datasets" not in inspect(self).unloaded:
+            for ds in self.datasets:
+                db.session.expire(ds, ["dmps"])
 
+        db.session.expire(self, ["datasets"])
         db.session.delete(self)
 
         if commit:
@@ -77,27 +200,45 @@ class DataManagementPlan(db.Model):
         """Get the dataset with the given dmp_id."""
         return cls.query.filter(cls.dmp_id == dmp_id).one_or_none()
 
+    @classmethod
+    def dmp_exists(cls, dmp_id: str) -> bool:
+        """Check if a DMP with the given dmp_id exists, without loading it."""
+        query = cls.query.filter(cls.dmp_id == dmp_id)
+        return db.session.query(query.exists()).scalar()
+
     @classmethod
     def get_by_record(cls, record: Record) -> List["DataManagementPlan"]:
         """Get all DMPs using the given Record in a Dataset."""
-        dataset = Dataset.get_by_record(record)
-
-        if dataset is not None:
-            return dataset.dmps
-
-        return []
+        # note: the record may have several PIDs, any of which may be the one
+        #       the Dataset is associated with
+        return (
+            cls.query.join(cls.datasets)
+            .join(
+                PersistentIdentifier, Dataset.record_pid_id == PersistentIdentifier.id
+            )
+            .filter(
+                PersistentIdentifier.object_type == "rec",
+                PersistentIdentifier.object_uuid == record.id,
+            )
+            .distinct()
+            .all()
+        )
 
     @classmethod
     def get_by_record_pid(
         cls, record_pid: PersistentIdentifier
     ) -> List["DataManagementPlan"]:
         """Get all DMPs using the Record with the given PID in a Dataset."""
-        dataset = Dataset.get_by_record_pid(record_pid)
-
-        if dataset is not None:
-            return dataset.dmps
+        record_pid_id = _get_pid_id(record_pid)
+        if record_pid_id is None:
+            # no need to ask the database about something that isn't an ID
+            return []
 
-        return []
+        return (
+            cls.query.join(cls.datasets)
+            .filter(Dataset.record_pid_id == record_pid_id)
+            .all()
+        )
 
     @classmethod
     def create(
@@ -109,11 +250,7 @@ class DataManagementPlan(db.Model):
         dmp = None
 
         try:
-            if not datasets:
-                datasets = []
-            elif isinstance(datasets, Dataset):
-                # if the argument is a single Dataset, put it in a new list
-                datasets = [datasets]
+            datasets = _as_list(datasets, Dataset)
 
             with db.session.begin_nested():
                 dmp = cls(
@@ -128,6 +265,27 @@ class DataManagementPlan(db.Model):
 
         return dmp
 
+    @classmethod
+    def create_many(cls, dmps: List[dict]) -> List["DataManagementPlan"]:
+        """Create and store several DMPs at once.
+
+        :param dmps: The properties for the DMPs to create, as dictionaries
+                     with the keys 'dmp_id' and (optionally) 'datasets'
+        :return: The created DMPs, in the same order
+        """
+        created = []
+        for properties in dmps:
+            datasets = _as_list(properties.get("datasets"), Dataset)
+
+            dmp = cls(dmp_id=properties["dmp_id"])
+            dmp.datasets.extend(datasets)
+            created.append(dmp)
+
+        with db.session.begin_nested():
+            db.session.add_all(created)
+
+        return created
+
 
 class Dataset(db.Model):
     """Dataset as defined in a Data Management Plan.
@@ -168,9 +326,12 @@ class Dataset(db.Model):
         unique=True,
     )
 
+    # the PID is required for pretty much everything regarding the record,
+    # so we load it together with the Dataset itself
     record_pid = db.relationship(
         PersistentIdentifier,
         foreign_keys=[record_pid_id],
+        lazy="joined",
     )
 
     @property
@@ -179,17 +340,31 @@ class Dataset(db.Model):
         # since accessing the 'record' property may be expensive, we try
         # to minimize the cost of this function by checking the
         # 'record_pid_id' first, which does not require joins
-        if self.record_pid_id is None or self.record_pid is None:
-            return False
-        elif self.record is None:
-            return False
-        else:
-            return True
+        return self.record_pid_id is not None and self._record_exists()
 
     @property
     def is_zombie(self) -> bool:
         """Check if this Dataset is a zombie (i.e. it has a dangling PID)."""
-        return self.record_pid_id is not None and self.record is None
+        return self.record_pid_id is not None and not self._record_exists()
+
+    def _record_exists(self) -> bool:
+        """Check if the associated Record exists, without loading it."""
+        if self.record_pid is None:
+            return False
+
+        cached = self._get_cached_record()
+        if cached is not None:
+            return cached[1] is not None
+
+        record_uuid = self.record_pid.get_assigned_object()
+        if record_uuid is None:
+            return False
+
+        exist_clauses = [
+            model.query.filter(condition).exists()
+            for model, condition in _record_conditions(record_uuid)
+        ]
+        return db.session.query(or_(*exist_clauses)).scalar()
 
     @property
     def record(self) -> Optional[Record]:
@@ -197,38 +372,104 @@ class Dataset(db.Model):
         if self.record_pid is None:
             return None
 
-        record = None
-        record_uuid = self.record_pid.get_assigned_object()
-        for api_cls in (Record, BibliographicRecordDraft):
-            try:
-                record = api_cls.get_record(record_uuid)
-            except NoResultFound:
+        cached = self._get_cached_record()
+        if cached is None:
+            Dataset.load_records([self])
+            cached = self._get_cached_record()
+
+        return cached[1]
+
+    def _get_cached_record(self) -> Optional[Tuple[uuid.UUID, Optional[Record]]]:
+        """Get the cached (record UUID, Record) pair, if it is still valid."""
+        cached = getattr(self, "_cached_record", None)
+        if cached is None or self.record_pid is None:
+            return None
+        elif cached[0] != self.record_pid.get_assigned_object():
+            # the PID has been changed in the meantime
+            return None
+        elif cached[1] is not None and _is_deleted(cached[1]):
+            # the record has been deleted in the meantime
+            return None
+
+        return cached
+
+    @classmethod
+    def load_records(cls, datasets: Iterable["Dataset"]):
+        """Fetch the Records for all the given Datasets in a batch.
+
+        The Records are cached on the Datasets, so accessing their 'record'
+        property afterwards doesn't require any further queries.
+        """
+        datasets_by_uuid = {}
+        preferred_api_classes = {}
+        for dataset in datasets:
+            pid = dataset.record_pid
+            if pid is None or dataset._get_cached_record() is not None:
                 continue
-            else:
-                # no exception means that we found a record
-                break
 
-        return record
+            # the PID of a draft only gets registered when it's published, so
+            # we can check the most likely candidate first
+            record_uuid = pid.get_assigned_object()
+            datasets_by_uuid.setdefault(record_uuid, []).append(dataset)
+            preferred_api_classes[record_uuid] = (
+                Record
+                if pid.status == PIDStatus.REGISTERED
+                else BibliographicRecordDraft
+            )
+
+        records = {}
+        for check_preferred in (True, False):
+            for api_cls in (Record, BibliographicRecordDraft):
+                record_uuids = [
+                    record_uuid
+                    for record_uuid, preferred in preferred_api_classes.items()
+                    if record_uuid is not None
+                    and record_uuid not in records
+                    and (preferred is api_cls) == check_preferred
+                ]
+                if record_uuids:
+                    for record in api_cls.get_records(record_uuids):
+                        records[record.id] = record
+
+        for record_uuid, uuid_datasets in datasets_by_uuid.items():
+            for dataset in uuid_datasets:
+                dataset._cached_record = (record_uuid, records.get(record_uuid))
 
     @record.setter
     def record(self, record: Record, emit_signal=True):
         old_pid = self.record_pid
         rec_id = record.id
-        pids = PersistentIdentifier.query.filter_by(object_uuid=rec_id).all()
         # TODO make the function for fetching the "best" PID configurable
-        pid = pids[0]
+        pid = (
+            PersistentIdentifier.query.filter_by(object_type="rec", object_uuid=rec_id)
+            .order_by(PersistentIdentifier.created)
+            .first()
+        )
+        if pid is None:
+            raise LookupError("no PID found for record: %s" % rec_id)
+
         # TODO emit a signal that the record has been changed; will be useful
         #      for detecting updates to be sent to the DMP Tool
         self.record_pid = pid
+        self._cached_record = (rec_id, record)
 
         if emit_signal:
-            dataset_changed.send(self, old_pid=old_pid, new_pid=pid)
+            send_after_commit(dataset_changed, self, old_pid=old_pid, new_pid=pid)
 
     def delete(self, commit=True):
         """Delete the dataset, but do not delete associated DMPs or records."""
-        for dmp in self.dmps:
-            dmp.datasets.remove(self)
+        db.session.execute(
+            datamanagementplan_dataset.delete().where(
+                datamanagementplan_dataset.c.dataset_id == self.id
+            )
+        )
+        # the association rows are gone already, so the ORM must not try to
+        # delete them again based on the (possibly loaded) collections
+        if "dmps" not in inspect(self).unloaded:
+            for dmp in self.dmps:
+                db.session.expire(dmp, ["datasets"])
 
+        db.session.expire(self, ["dmps"])
         db.session.delete(self)
 
         if commit:
@@ -242,45 +483,68 @@ class Dataset(db.Model):
     @classmethod
     def get_by_record(cls, record: Record) -> Optional["Dataset"]:
         """Get the associated Dataset for the given Record."""
-        # TODO: a record may have multiple PIDs, and the Dataset is only
+        # note: a record may have multiple PIDs, and the Dataset is only
         #       associated with one of these PIDs
-        pid = PersistentIdentifier.query.filter(
-            PersistentIdentifier.object_uuid == record.id
-        ).first()
-
-        if pid is None:
-            return None
-
-        return cls.get_by_record_pid(pid)
+        return (
+            cls.query.join(
+                PersistentIdentifier, cls.record_pid_id == PersistentIdentifier.id
+            )
+            .options(contains_eager(cls.record_pid))
+            .filter(
+                PersistentIdentifier.object_type == "rec",
+                PersistentIdentifier.object_uuid == record.id,
+            )
+            .first()
+        )
 
     @classmethod
     def get_by_record_pid(cls, record_pid: PersistentIdentifier) -> Optional["Dataset"]:
         """Get the associated Dataset for the Record with the given PID."""
-        if isinstance(record_pid, PersistentIdentifier):
-            record_pid_id = record_pid.id
-        else:
-            record_pid_id = record_pid
+        record_pid_id = _get_pid_id(record_pid)
+        if record_pid_id is None:
+            # no need to ask the database about something that isn't an ID
+            return None
 
-        return cls.query.filter(cls.record_pid_id == record_pid_id).first()
+        return cls.query.filter(cls.record_pid_id == record_pid_id).one_or_none()
 
     @classmethod
     def get_zombies(cls) -> List["Dataset"]:
         """Get all Datasets that are associated with non-existing records."""
-        return [
-            ds
-            for ds in cls.query.filter(cls.record_pid_id != None)  # noqa
-            if ds.record is None
-        ]
+        query, record_missing = cls._query_with_records(isouter=False)
+        return query.filter(record_missing).all()
 
     @classmethod
     def get_orphans(cls, include_zombies: bool = False) -> List["Dataset"]:
         """Get all Datasets that don't have an associated record."""
         if include_zombies:
-            # TODO
-            return []
+            query, record_missing = cls._query_with_records(isouter=True)
+            return query.filter(or_(cls.record_pid_id.is_(None), record_missing)).all()
         else:
             return cls.query.filter(cls.record_pid_id == None).all()  # noqa
 
+    @classmethod
+    def _query_with_records(cls, isouter: bool):
+        """Create a query for Datasets, joined with their PIDs and records.
+
+        Returns the query and a condition that is true if the record referenced
+        by the dataset's PID does not exist.
+        """
+        # populate the record_pid relationship from the explicit join, instead
+        # of joining the PID table a second time for the (joined) eager load
+        query = cls.query.join(
+            PersistentIdentifier,
+            cls.record_pid_id == PersistentIdentifier.id,
+            isouter=isouter,
+        ).options(contains_eager(cls.record_pid))
+
+        missing = []
+        record_uuid = PersistentIdentifier.object_uuid
+        for model, condition in _record_conditions(record_uuid, alias=True):
+            query = query.outerjoin(model, condition)
+            missing.append(model.id.is_(None))
+
+        return query, and_(*missing)
+
     @classmethod
     def create(
         cls,
@@ -296,11 +560,7 @@ class Dataset(db.Model):
             if isinstance(record_pid, PersistentIdentifier):
                 record_pid_id = record_pid.id
 
-            if not dmps:
-                dmps = []
-            elif isinstance(dmps, DataManagementPlan):
-                # if the argument is a single DMP, put it in a new list
-                dmps = [dmps]
+            dmps = _as_list(dmps, DataManagementPlan)
 
             with db.session.begin_nested():
                 dataset = cls(
@@ -316,14 +576,59 @@ class Dataset(db.Model):
 
         return dataset
 
+    @classmethod
+    def create_many(
+        cls,
+        datasets: List[dict],
+        dmps: List[DataManagementPlan] = None,
+    ) -> List["Dataset"]:
+        """Create and store several Datasets at once.
+
+        :param datasets: The properties for the Datasets to create, as
+                         dictionaries with the keys 'dataset_id' and
+                         'record_pid'
+        :param dmps: The DMPs to associate all the created Datasets with
+        :return: The created Datasets, in the same order
+        """
+        dmps = _as_list(dmps, DataManagementPlan)
+
+        created = []
+        for properties in datasets:
+            record_pid_id = properties.get("record_pid")
+            if isinstance(record_pid_id, PersistentIdentifier):
+                record_pid_id = record_pid_id.id
+
+            dataset = cls(
+                dataset_id=properties["dataset_id"],
+                record_pid_id=record_pid_id,
+            )
+            dataset.dmps.extend(dmps)
+            created.append(dataset)
+
+        with db.session.begin_nested():
+            db.session.add_all(created)
+
+        return created
+
     def __eq__(self, other: "Dataset") -> bool:
         """Check if this Dataset is equal to the other."""
         if not isinstance(other, self.__class__):
             return False
-        elif self is other or self.id == other.id:
-            return True
 
-        return (
-            self.dataset_id == other.dataset_id
-            and self.record_pid_id == other.record_pid_id
-        )
+        return self is other or (self.id is not None and self.id == other.id)
+
+    def __hash__(self) -> int:
+        """Calculate the hash value for this Dataset, based on its ID."""
+        return hash(self.id) if self.id is not None else id(self)
+
+
+@event.listens_for(DataManagementPlan, "init")
+@event.listens_for(Dataset, "init")
+def _assign_id(target, args, kwargs):
+    """Assign the primary key already when the DMP or Dataset is created.
+
+    Having the primary key from the start keeps the hash value of Datasets
+    stable across flushes, and lets the ORM batch the INSERTs of several new
+    objects into a single executemany() instead of one per row.
+    """
+    kwargs.setdefault("id", uuid.uuid4())
@@ -1,9 +1,113 @@
 """Signals for Invenio-MaDMP."""
 
 from blinker import Namespace
+from invenio_db import db
+from sqlalchemy import event
 
 _signals = Namespace()
 
 record_changed = _signals.signal("record-changed")
+"""Signal sent when a record associated with a dataset has changed."""
+
 dataset_changed = _signals.signal("dataset-changed")
+"""Signal sent when a dataset's record has been changed.
+
+The sender is the dataset, and the keyword arguments are ``old_pid`` and
+``new_pid`` (the record PIDs before and after the change).
+"""
+
 dmp_changed = _signals.signal("dmp-changed")
+"""Signal sent when datasets have been added to or removed from a DMP.
+
+The sender is the DMP, and the keyword argument depends on the change:
+
+* ``new_dataset``: the dataset added via ``add_dataset()``
+* ``removed_dataset``: the dataset removed via ``remove_dataset()``
+* ``new_datasets``: the list of datasets added via ``add_datasets()``
+* ``removed_datasets``: the list of datasets removed via ``remove_datasets()``
+"""
+
+_PENDING_SIGNALS_KEY = "invenio_madmp_pending_signals"
+_COMMITTED_TRANSACTIONS_KEY = "invenio_madmp_committed_transactions"
+
+
+def _freeze(value):
+    """Turn the value into a hashable equivalent, for identifying signals."""
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(val)) for key, val in value.items()))
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        return tuple(_freeze(val) for val in value)
+
+    return value
+
+
+def _queue_signals(session, transaction, signals):
+    """Queue the signals for the transaction.
+
+    If an identical signal has been queued already, only the later one is
+    kept. This way, the receivers only hear about each change once, and in
+    the order of the latest changes (e.g. add, remove and add again results
+    in remove and add).
+    """
+    pending = session.info.setdefault(_PENDING_SIGNALS_KEY, {})
+    queue = pending.setdefault(transaction, {})
+    for signal, sender, kwargs in signals:
+        key = (signal, sender, _freeze(kwargs))
+        queue.pop(key, None)
+        queue[key] = (signal, sender, kwargs)
+
+
+def send_after_commit(signal, sender, **kwargs):
+    """Send the signal once the current transaction has been committed.
+
+    This keeps the transaction short, because signal handlers don't run while
+    it is still open. If the transaction (or the savepoint in which the signal
+    was queued) is rolled back instead, the signal is discarded. Identical
+    signals are only sent once per transaction.
+
+    The receivers may query the database, but should not write to it via
+    ``db.session``: with SQLAlchemy 1.3, the session's next transaction has
+    not begun yet when the signals are sent. For the same reason, signals
+    sent by such receivers are sent immediately, since there's no transaction
+    that they could wait for.
+    """
+    session = db.session()
+    if session.transaction is None:
+        signal.send(sender, **kwargs)
+        return
+
+    _queue_signals(session, session.transaction, [(signal, sender, kwargs)])
+
+
+# note: only the sessions of db.session are watched, not every session
+#       that the application (or other modules) may create
+@event.listens_for(db.session, "after_commit")
+def _mark_committed(session):
+    """Remember that the transaction has been committed, not rolled back."""
+    committed = session.info.setdefault(_COMMITTED_TRANSACTIONS_KEY, set())
+    committed.add(session.transaction)
+
+
+@event.listens_for(db.session, "after_transaction_end")
+def _handle_pending_signals(session, transaction):
+    """Send, hand over or discard the signals queued in the transaction.
+
+    Signals from savepoints and subtransactions are handed over to the
+    enclosing transaction, unless the savepoint has been rolled back.
+    The signals are only sent when the outermost transaction is committed,
+    which (unlike ``after_commit``) allows receivers to emit SQL again.
+    """
+    committed = session.info.get(_COMMITTED_TRANSACTIONS_KEY, set())
+    was_committed = transaction in committed
+    committed.discard(transaction)
+
+    queue = session.info.get(_PENDING_SIGNALS_KEY, {}).pop(transaction, {})
+    signals = list(queue.values())
+    if not signals or (transaction.nested and not was_committed):
+        return
+
+    if transaction.parent is not None:
+        _queue_signals(session, transaction.parent, signals)
+    elif was_committed:
+        for signal, sender, kwargs in signals:
+            signal.send(sender, **kwargs)
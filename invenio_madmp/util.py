@@ -2,17 +2,21 @@
 
 import re
 from datetime import datetime
+from functools import wraps
 from typing import Dict
 
 from flask import current_app as app
+from flask import g, has_app_context
 from invenio_accounts.models import User
 from invenio_pidstore.models import PersistentIdentifier as PID
 from invenio_records.models import RecordMetadata
+from sqlalchemy import and_
 from werkzeug.utils import import_string
 
 from .licenses import License
 
 url_identifier_pattern = re.compile(r"https?://.*?/(.*)")
+record_access_url_pattern = re.compile(r"https?://.*?/records/(.*)")
 name_pattern_1 = re.compile(r"([^\s]+)\s+([^\s]+)")
 name_pattern_2 = re.compile(r"([^\s]+),\s+([^\s]+)")
 
@@ -35,11 +39,20 @@ def format_date(date, fmt="%Y-%m-%d"):
     return date.strftime(fmt)
 
 
-def distribution_matches_us(distribution_dict):
-    """Check if the 'host' of the distribution matches our repository."""
+def distribution_matches_us(distribution_dict, host_url=None, host_title=None):
+    """Check if the 'host' of the distribution matches our repository.
+
+    If the host's URL or title are not specified, they are taken from the
+    configuration.
+    """
+    if host_url is None:
+        host_url = app.config["MADMP_HOST_URL"]
+    if host_title is None:
+        host_title = app.config["MADMP_HOST_TITLE"]
+
     host = distribution_dict.get("host", {})
-    url_matches = host.get("url", None) == app.config["MADMP_HOST_URL"]
-    title_matches = host.get("title", None) == app.config["MADMP_HOST_TITLE"]
+    url_matches = host.get("url", None) == host_url
+    title_matches = host.get("title", None) == host_title
     return url_matches or title_matches
 
 
@@ -60,12 +73,10 @@ def translate_dataset_type(dataset_dict):
 def translate_license(license_dict):
     """Try to find the referenced license in the list of known licenses."""
     licenses = app.config["MADMP_LICENSES"]
+    values = tuple(license_dict.values())
 
-    matching_licenses = [lic for lic in licenses if lic.matches(*license_dict.values())]
-
-    if matching_licenses:
-        lic = matching_licenses[0]
-    else:
+    lic = next((lic for lic in licenses if lic.matches(*values)), None)
+    if lic is None:
         lic = License("Other", "Other", "", "Other")
 
     return lic.to_dict()
@@ -85,8 +96,9 @@ def translate_person_details(person_dict: Dict) -> Dict:
     name = person_dict.get("name", None)
 
     if name:
+        # only try the second pattern if the first one doesn't match
         m1 = name_pattern_1.match(name)
-        m2 = name_pattern_2.match(name)
+        m2 = name_pattern_2.match(name) if not m1 else None
         if m1:
             additional_infos["given_name"] = m1.group(1)
             additional_infos["family_name"] = m1.group(2)
@@ -111,33 +123,102 @@ def fetch_unassigned_record(dataset_identifier, distribution_access_url=None):
     :return: The Record identified by the provided means
     :rtype: Record
     """
-    rec = None
+    records = fetch_unassigned_records([(dataset_identifier, distribution_access_url)])
+    return records.get(dataset_identifier)
+
+
+def fetch_unassigned_records(identifiers):
+    """Try to find (yet unassigned) records for several datasets at once.
+
+    For each dataset, try to find a record with an associated PID that has the
+    same value as the dataset identifier.
+    If the distribution's (i.e. record's) access URL is specified, it will
+    take precedence over the dataset's identifier for the search.
+    This requires only two queries in total, regardless of the number
+    of datasets.
+    :param identifiers: Pairs of dataset identifiers and (optional)
+                        distribution access URLs
+    :type identifiers: list
+    :return: The found Records, keyed by their dataset identifiers
+    :rtype: dict
+    """
+    recids, pid_values = {}, {}
+    for dataset_identifier, distribution_access_url in identifiers:
+        if distribution_access_url:
+            # TODO use a better variant of getting the record via the access url
+            #      (=landing page)
+            match = record_access_url_pattern.match(distribution_access_url)
+            if match:
+                recids[dataset_identifier] = match.group(1)
+
+        # in case of a DOI, remove the possibly leading "https://doi.org/"
+        pid_values[dataset_identifier] = strip_identifier(dataset_identifier)
+
+    records_by_recid, records_by_pid_value = {}, {}
+    if recids:
+        query = (
+            _query_records_by_pid()
+            .add_columns(PID.pid_value)
+            .filter(PID.pid_type == "recid", PID.pid_value.in_(set(recids.values())))
+        )
+        records_by_recid = {pid_value: rec for rec, pid_value in query}
+
+    if pid_values:
+        # the PID type of the dataset identifiers is unknown (e.g. DOIs may be
+        # registered with different types), so this can't restrict it
+        query = (
+            _query_records_by_pid()
+            .add_columns(PID.pid_value)
+            .filter(PID.pid_value.in_(set(pid_values.values())))
+        )
+        records_by_pid_value = {pid_value: rec for rec, pid_value in query}
+
+    records = {}
+    for dataset_identifier, pid_value in pid_values.items():
+        rec = records_by_recid.get(recids.get(dataset_identifier))
+        if rec is None:
+            rec = records_by_pid_value.get(pid_value)
+
+        if rec is not None:
+            records[dataset_identifier] = rec
+
+    return records
+
+
+def _query_records_by_pid():
+    """Create a query for records, joined with their PIDs."""
+    # note: also filtering by the object type lets the database use the PID
+    #       table's index on (object_type, object_uuid) for the join; filters
+    #       on the PID value can only use the (pid_type, pid_value) index if
+    #       they restrict the PID type as well
+    return RecordMetadata.query.join(
+        PID, and_(PID.object_type == "rec", PID.object_uuid == RecordMetadata.id)
+    )
+
+
+def request_cached(func):
+    """Cache the function's results for the current application context.
+
+    This should only be used for lookups whose results don't change during
+    a request (e.g. as a side effect of the request itself).
+    """
 
-    if distribution_access_url:
-        # TODO use a better variant of getting the record via the access url
-        #      (=landing page)
-        p = r"https?://.*?/records/(.*)"
-        match = re.match(p, distribution_access_url)
-        if match:
-            recid = match.group(1)
-            pid = PID.get("recid", recid)
-            if pid is not None:
-                rec = RecordMetadata.query.get(
-                    pid.object_uuid
-                )  # TODO may also be a Draft?
-                if rec:
-                    return rec
+    @wraps(func)
+    def wrapper(*args):
+        if not has_app_context():
+            return func(*args)
 
-    # in case of a DOI, remove the possibly leading "https://doi.org/"
-    dataset_identifier = strip_identifier(dataset_identifier)
+        cache = g.setdefault("_madmp_cache", {})
+        key = (func.__qualname__, args)
+        if key not in cache:
+            cache[key] = func(*args)
 
-    pid = PID.query.filter(PID.pid_value == dataset_identifier).one_or_none()
-    if pid is not None:
-        rec = RecordMetadata.query.get(pid.object_uuid)  # TODO may be a Draft?
+        return cache[key]
 
-    return rec
+    return wrapper
 
 
+@request_cached
 def find_user(email):
     """Find a user by their e-mail address."""
     user = User.query.filter(User.email == email).one_or_none()
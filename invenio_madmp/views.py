@@ -1,25 +1,63 @@
 """Blueprint definitions for maDMP integration."""
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, json, jsonify, request, stream_with_context
 from invenio_db import db
 
 from .convert import convert_dmp
-from .models import DataManagementPlan
+from .models import DataManagementPlan, Dataset
 
 
-def _summarize_dmp(dmp: DataManagementPlan) -> dict:
+def _summarize_dataset(dataset: Dataset, detail: bool = True) -> dict:
+    """Create a summary dictionary for the given dataset.
+
+    Without details, only the value of the record's PID is included instead of
+    the record's metadata.
+    """
+    if not detail:
+        record_pid = dataset.record_pid
+        return {
+            "dataset_id": dataset.dataset_id,
+            "record_pid": record_pid.pid_value if record_pid else None,
+        }
+
+    # note: Dataset.record is a property that checks the cached record
+    record = dataset.record
+    return {
+        "dataset_id": dataset.dataset_id,
+        "record": record.model.json if record else None,
+    }
+
+
+def _summarize_dmp(dmp: DataManagementPlan, detail: bool = True) -> dict:
     """Create a summary dictionary for the given DMP."""
-    res = {"dmp_id": dmp.dmp_id, "datasets": []}
+    if detail:
+        Dataset.load_records(dmp.datasets)
+
+    datasets = [_summarize_dataset(ds, detail) for ds in dmp.datasets]
+
+    return {"dmp_id": dmp.dmp_id, "datasets": datasets}
+
 
-    for ds in dmp.datasets:
-        dataset = {"dataset_id": ds.dataset_id, "record": None}
+def _dmp_batches(size: int):
+    """Fetch all DMPs in batches of (at most) the given size.
 
-        if ds.record:
-            dataset["record"] = ds.record.model.json
+    Each batch is fetched completely with its own (keyset-paginated) query, so
+    no cursor has to stay open while a batch is being processed.
+    """
+    last_id = None
+    while True:
+        query = DataManagementPlan.query.order_by(DataManagementPlan.id)
+        if last_id is not None:
+            query = query.filter(DataManagementPlan.id > last_id)
 
-        res["datasets"].append(dataset)
+        batch = query.limit(size).all()
+        if batch:
+            yield batch
 
-    return res
+        if len(batch) < size:
+            return
+
+        last_id = batch[-1].id
 
 
 def create_rest_blueprint(app) -> Blueprint:
@@ -34,27 +72,48 @@ def create_rest_blueprint(app) -> Blueprint:
     @auth.login_required
     def list_dmps():
         """Give a summary of all stored DMPs."""
-        dmps = DataManagementPlan.query.all()
-        res = [_summarize_dmp(dmp) for dmp in dmps]
+        detail = request.args.get("detail", "full")
+        if detail not in ("full", "short"):
+            return jsonify({"error": "detail must be either 'full' or 'short'"}), 400
+
+        detail = detail == "full"
+
+        def generate():
+            # stream the summaries batch by batch, instead of building the
+            # whole list of DMPs (and their JSON) in memory
+            separator = ""
+            yield "["
+            for batch in _dmp_batches(100):
+                if detail:
+                    Dataset.load_records(ds for dmp in batch for ds in dmp.datasets)
+
+                for dmp in batch:
+                    yield separator + json.dumps(_summarize_dmp(dmp, detail))
+                    separator = ","
 
-        return jsonify(res)
+            yield "]"
+
+        return Response(stream_with_context(generate()), mimetype="application/json")
 
     @rest_blueprint.route("/dmps", methods=["POST"])
     @auth.login_required
     def create_dmp():
         """Create a new DMP from the maDMP JSON in the request body."""
-        if request.json is None:
+        body = request.get_json(silent=True)
+        if body is None:
             return jsonify({"error": "no json body supplied"}), 400
-        elif request.json.get("dmp") is None:
+
+        dmp_json = body.get("dmp")
+        if dmp_json is None:
             return jsonify({"error": "dmp not found in the body"}), 400
 
-        dmp_json = request.json.get("dmp", {})
         dmp_json_id = dmp_json.get("dmp_id", {}).get("identifier")
 
-        if DataManagementPlan.get_by_dmp_id(dmp_json_id) is not None:
+        if DataManagementPlan.dmp_exists(dmp_json_id):
             return jsonify({"error": "dmp with the same id already exists"}), 409
 
-        dmp = convert_dmp(dmp_json)
+        # we already know that the DMP doesn't exist yet
+        dmp = convert_dmp(dmp_json, dmp=DataManagementPlan(dmp_id=dmp_json_id))
         db.session.add(dmp)
         db.session.commit()
 
@@ -67,22 +126,25 @@ def create_rest_blueprint(app) -> Blueprint:
         """Update the specified DMP using the maDMP JSON in the request body."""
         hard_sync = request.args.get("sync", "soft") == "hard"
 
-        if request.json is None:
+        body = request.get_json(silent=True)
+        if body is None:
             return jsonify({"error": "no json body supplied"}), 400
-        elif request.json.get("dmp") is None:
+
+        dmp_json = body.get("dmp")
+        if dmp_json is None:
             return jsonify({"error": "dmp not found in the body"}), 400
 
-        dmp_json = request.json.get("dmp", {})
         dmp_json_id = dmp_json.get("dmp_id", {}).get("identifier")
 
         if dmp_id and dmp_json_id and dmp_id != dmp_json_id:
             return jsonify({"error": "mismatch between dmp id from url and body"}), 400
 
         dmp_id = dmp_id or dmp_json_id
-        if DataManagementPlan.get_by_dmp_id(dmp_id) is None:
+        dmp = DataManagementPlan.get_by_dmp_id(dmp_id)
+        if dmp is None:
             return jsonify({"error": "dmp not found"}), 404
 
-        dmp = convert_dmp(dmp_json, hard_sync)
+        dmp = convert_dmp(dmp_json, hard_sync, dmp=dmp)
         db.session.commit()
 
         # TODO change the returned value
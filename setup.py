@@ -93,7 +93,8 @@ setup(
         "invenio_i18n.translations": [
             "messages = invenio_madmp",
         ],
-        "invenio_db.models": ["invenio_madmp = invenio_madmp.models"]
+        "invenio_db.alembic": ["invenio_madmp = invenio_madmp:alembic"],
+        "invenio_db.models": ["invenio_madmp = invenio_madmp.models"],
         # TODO: Edit these entry points to fit your needs.
         # 'invenio_access.actions': [],
         # 'invenio_admin.actions': [],
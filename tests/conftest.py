@@ -16,6 +16,7 @@ import os
 import os.path
 import shutil
 import tempfile
+from functools import lru_cache
 
 import pytest
 from flask import Flask
@@ -32,11 +33,63 @@ from invenio_pidstore import InvenioPIDStore
 from invenio_rdm_records.services import BibliographicRecordService
 from invenio_records import InvenioRecords
 from invenio_search import InvenioSearch
+from sqlalchemy import event
 from sqlalchemy_utils.functions import create_database, database_exists, drop_database
 
 from invenio_madmp import InvenioMaDMP
 from invenio_madmp.convert.records import RDMRecordConverter
 from invenio_madmp.models import DataManagementPlan, Dataset
+from invenio_madmp.signals import dmp_changed
+from invenio_madmp.views import create_rest_blueprint
+
+
+@lru_cache(maxsize=None)
+def _read_file(file_name):
+    """Read the file's content only once per test session."""
+    with open(file_name, "r") as file_:
+        return file_.read()
+
+
+def load_json(file_name):
+    """Load the JSON file's content, which the caller may modify freely."""
+    # parsing the cached text is cheaper than deep-copying the parsed objects
+    return json.loads(_read_file(file_name))
+
+
+@lru_cache(maxsize=None)
+def _example_madmp_paths():
+    """Get the paths of the example maDMP files, keyed by their names."""
+    dirname = os.path.join(os.path.dirname(__file__), "data", "madmps")
+    entries = [e for e in os.scandir(dirname) if e.name.endswith(".json")]
+    return {
+        os.path.splitext(entry.name)[0]: entry.path
+        for entry in sorted(entries, key=lambda e: e.name)
+    }
+
+
+def _requires_users(madmp):
+    """Check if converting the maDMP requires any user accounts."""
+    return any(
+        dist.get("host") is not None
+        for ds in madmp["dmp"].get("dataset", [])
+        for dist in ds.get("distribution", [])
+    )
+
+
+def pytest_generate_tests(metafunc):
+    """Parametrize the tests taking a ``madmp_name`` with the example maDMPs.
+
+    Tests that use the maDMPs requiring users only get the names of those.
+    """
+    if "madmp_name" not in metafunc.fixturenames:
+        return
+
+    names = list(_example_madmp_paths())
+    if "example_madmps_for_invenio_requiring_users" in metafunc.fixturenames:
+        paths = _example_madmp_paths()
+        names = [n for n in names if _requires_users(load_json(paths[n]))]
+
+    metafunc.parametrize("madmp_name", names)
 
 
 @pytest.fixture(scope="module")
@@ -48,17 +101,40 @@ def celery_config():
     return {}
 
 
-@pytest.fixture()
+def _database_uri():
+    """Get the database URI for the tests.
+
+    When running the tests in parallel with pytest-xdist, each worker gets
+    its own database (except for in-memory SQLite, which is per process).
+    """
+    uri = os.getenv("SQLALCHEMY_DATABASE_URI", "sqlite://")
+    worker = os.getenv("PYTEST_XDIST_WORKER")
+    if worker is None or uri == "sqlite://":
+        return uri
+
+    uri, sep, query = uri.partition("?")
+    return "%s_%s%s%s" % (uri, worker, sep, query)
+
+
+@pytest.fixture(scope="session")
 def base_app(request):
-    """Basic Flask application."""
+    """Basic Flask application, shared by all tests.
+
+    Tests that write to the database have to use the ``db_session`` fixture,
+    so that their changes are rolled back afterwards.
+    """
     instance_path = tempfile.mkdtemp()
     app = Flask("testapp")
     app.config.update(
         MADMP_HOST_URL="https://test.invenio.cern.ch",
         MADMP_HOST_TITLE="Invenio",
         MADMP_FALLBACK_RECORD_CONVERTER=RDMRecordConverter(),
-        SQLALCHEMY_DATABASE_URI=os.getenv("SQLALCHEMY_DATABASE_URI", "sqlite://"),
+        SQLALCHEMY_DATABASE_URI=_database_uri(),
         SQLALCHEMY_TRACK_MODIFICATIONS=False,
+        # hashing the test users' passwords properly would only slow down tests
+        SECURITY_PASSWORD_HASH="plaintext",
+        SECURITY_PASSWORD_SCHEMES=["plaintext"],
+        SECURITY_DEPRECATED_PASSWORD_SCHEMES=[],
     )
     Babel(app)
     InvenioConfigDefault(app)
@@ -71,6 +147,7 @@ def base_app(request):
     InvenioIndexer(app)
     InvenioSearch(app)
     InvenioMaDMP(app)
+    app.register_blueprint(create_rest_blueprint(app))
 
     with app.app_context():
         db_url = str(db.engine.url)
@@ -92,18 +169,47 @@ def base_app(request):
     return app
 
 
+@pytest.fixture()
+def db_session(base_app):
+    """Database session whose changes are rolled back after the test.
+
+    ``db.session`` is bound to a connection with a transaction that is never
+    committed, and a SAVEPOINT in which the session's transactions run.
+    From the session's point of view, its transactions are still the
+    outermost ones, so committing them triggers the signals sent after
+    commit as usual.
+    """
+    connection = db.engine.connect()
+    transaction = connection.begin()
+    savepoint = connection.begin_nested()
+
+    options = dict(db.session.session_factory.kw)
+    db.session.remove()
+    db.session.configure(bind=connection, binds={})
+
+    # lookups cached in the application context must not outlive the test
+    with base_app.app_context(), base_app.test_request_context():
+        session = db.session()
+
+        @event.listens_for(session, "after_transaction_end")
+        def restart_savepoint(session, trans):
+            # rolling back the session's transaction rolls back the savepoint
+            nonlocal savepoint
+            if trans.parent is None and not savepoint.is_active:
+                savepoint = connection.begin_nested()
+
+        yield session
+
+    db.session.remove()
+    db.session.session_factory.kw = options
+    transaction.rollback()
+    connection.close()
+
+
 @pytest.fixture()
 def example_madmps():
     """Dictionary with example maDMPs."""
-    res = {}
-    dirname = os.path.join(os.path.dirname(__file__), "data", "madmps")
-    for fname in [f for f in os.listdir(dirname) if f.endswith("json")]:
-        fbase = os.path.splitext(fname)[0]
-        with open(os.path.join(dirname, fname), "r") as madmp_file:
-            madmp_json = json.load(madmp_file)
-            res[fbase] = madmp_json
-
-    return res
+    return {name: load_json(path) for name, path in _example_madmp_paths().items()}
 
 
 @pytest.fixture()
@@ -122,19 +228,27 @@ def example_madmps_for_invenio(example_madmps):
 @pytest.fixture()
 def example_madmps_for_invenio_requiring_users(example_madmps_for_invenio):
     """Only those example maDMPs that have datasets and contributors."""
-    madmps = {}
-    for name, madmp in example_madmps_for_invenio.items():
-        dmp = madmp["dmp"]
-        for ds in dmp.get("dataset", []):
-            for dist in ds.get("distribution", []):
-                if dist.get("host") is not None:
-                    madmps[name] = madmp
+    return {
+        name: madmp
+        for name, madmp in example_madmps_for_invenio.items()
+        if _requires_users(madmp)
+    }
+
+
+@pytest.fixture()
+def dmp_changes():
+    """List of the (sender, kwargs) of the dmp_changed signals sent in the test."""
+    received = []
 
-    return madmps
+    def receiver(sender, **kwargs):
+        received.append((sender, kwargs))
+
+    with dmp_changed.connected_to(receiver):
+        yield received
 
 
 @pytest.fixture()
-def all_required_accounts(base_app):
+def all_required_accounts(base_app, db_session):
     """All required user accounts for the example maDMPs."""
     datastore = base_app.extensions["security"].datastore
     u1 = datastore.create_user(
@@ -156,9 +270,9 @@ def all_required_accounts(base_app):
     return [u1, u2, u3, u4, u5, u6]
 
 
-@pytest.fixture()
-def example_data(base_app):
-    """Create a collection of example records, datasets and DMPs."""
+@pytest.fixture(scope="session")
+def stored_example_data(base_app):
+    """Create a collection of example records, datasets and DMPs once."""
     records = []
     rec_dir = os.path.join(os.path.dirname(__file__), "data", "records")
     service = BibliographicRecordService()
@@ -166,12 +280,11 @@ def example_data(base_app):
     identity.provides.add(any_user)
 
     # create some records from the example data
-    for fn in sorted(f for f in os.listdir(rec_dir) if f.endswith(".json")):
-        ffn = os.path.join(rec_dir, fn)
-        with open(ffn, "r") as rec_file:
-            data = json.load(rec_file)
-            rec = service.create(identity, data)
-            records.append(rec._record)
+    rec_entries = [e for e in os.scandir(rec_dir) if e.name.endswith(".json")]
+    for entry in sorted(rec_entries, key=lambda e: e.name):
+        data = load_json(entry.path)
+        rec = service.create(identity, data)
+        records.append(rec._record)
 
     # create some datasets
     datasets = []
@@ -182,22 +295,45 @@ def example_data(base_app):
         ds = Dataset.create(ds_id, rec_pid)
         datasets.append(ds)
 
-    unused_records = records[7:]
-
     # create some DMPs
     dss = datasets
-    dmp1 = DataManagementPlan.create("dmp-1", [dss[0]])
-    dmp2 = DataManagementPlan.create("dmp-2", [dss[0], dss[1], dss[2]])
-    dmp3 = DataManagementPlan.create("dmp-3", [dss[2], dss[3]])
-    dmp4 = DataManagementPlan.create("dmp-4", [dss[4], dss[5]])
-    unused_datasets = [dss[6]]
-    used_datasets = datasets[:6]
+    DataManagementPlan.create("dmp-1", [dss[0]])
+    DataManagementPlan.create("dmp-2", [dss[0], dss[1], dss[2]])
+    DataManagementPlan.create("dmp-3", [dss[2], dss[3]])
+    DataManagementPlan.create("dmp-4", [dss[4], dss[5]])
+
+    # the objects are only loaded again in the tests' own sessions
+    stored = {
+        "records": [(type(rec), rec.id) for rec in records],
+        "datasets": [ds.dataset_id for ds in datasets],
+        "dmps": ["dmp-1", "dmp-2", "dmp-3", "dmp-4"],
+    }
+    db.session.commit()
+    db.session.remove()
+
+    return stored
+
+
+@pytest.fixture()
+def example_data(stored_example_data, db_session):
+    """The example records, datasets and DMPs, loaded in the test's session."""
+    records = [
+        record_cls.get_record(record_id)
+        for record_cls, record_id in stored_example_data["records"]
+    ]
+    datasets = [
+        Dataset.get_by_dataset_id(ds_id) for ds_id in stored_example_data["datasets"]
+    ]
+    dmps = [
+        DataManagementPlan.get_by_dmp_id(dmp_id)
+        for dmp_id in stored_example_data["dmps"]
+    ]
 
     return {
         "records": records,
-        "unused_records": unused_records,
+        "unused_records": records[7:],
         "datasets": datasets,
-        "used_datasets": used_datasets,
-        "unused_datasets": unused_datasets,
-        "dmps": [dmp1, dmp2, dmp3, dmp4],
+        "used_datasets": datasets[:6],
+        "unused_datasets": datasets[6:],
+        "dmps": dmps,
     }
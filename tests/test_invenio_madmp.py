@@ -7,13 +7,35 @@
 
 """Module tests."""
 
+from contextlib import contextmanager
+
 import pytest
 from flask import Flask
 from invenio_accounts.models import User
+from invenio_db import db
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
 
 from invenio_madmp import InvenioMaDMP
 from invenio_madmp.convert import convert_dmp
 from invenio_madmp.models import DataManagementPlan, Dataset
+from invenio_madmp.signals import dataset_changed, dmp_changed, send_after_commit
+
+
+@contextmanager
+def count_queries():
+    """Collect the SQL statements executed within the context."""
+    statements = []
+
+    def collect(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", collect)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, "before_cursor_execute", collect)
 
 
 def test_version():
@@ -45,6 +67,38 @@ def test_init():
 # ------->
 
 
+def test_create_many_datasets(base_app, example_data):
+    dmp = example_data["dmps"][0]
+    records = example_data["unused_records"][:3]
+    datasets = Dataset.create_many(
+        [
+            {"dataset_id": "new-dataset-%s" % i, "record_pid": rec.pid}
+            for i, rec in enumerate(records)
+        ],
+        dmps=[dmp],
+    )
+
+    assert len(datasets) == len(records)
+    for i, rec in enumerate(records):
+        dataset = Dataset.get_by_dataset_id("new-dataset-%s" % i)
+        assert dataset is datasets[i]
+        assert dataset.record.id == rec.id
+        assert dmp.has_dataset(dataset)
+
+
+def test_delete_dataset(base_app, example_data):
+    dataset = Dataset.get_by_dataset_id("dataset-3")
+    dmps = dataset.dmps
+    assert dmps
+
+    dataset.delete()
+
+    assert Dataset.get_by_dataset_id("dataset-3") is None
+    for dmp in dmps:
+        assert DataManagementPlan.get_by_dmp_id(dmp.dmp_id) is not None
+        assert "dataset-3" not in [ds.dataset_id for ds in dmp.datasets]
+
+
 def test_find_dataset_by_id(base_app, example_data):
     dataset = Dataset.get_by_dataset_id("dataset-1")
 
@@ -80,6 +134,48 @@ def test_find_dataset_by_record_pid_nonexisting(base_app, example_data):
     assert dataset is None
 
 
+def test_load_records(base_app, example_data):
+    datasets = Dataset.query.all()
+    Dataset.load_records(datasets)
+
+    with count_queries() as queries:
+        records = [dataset.record for dataset in datasets]
+
+    assert queries == []
+    for dataset, record in zip(datasets, records):
+        assert record is not None
+        assert record.id == dataset.record_pid.object_uuid
+
+
+def test_has_record(base_app, example_data):
+    for dataset in Dataset.query.all():
+        assert dataset.has_record
+        assert not dataset.is_zombie
+
+
+def test_record_deleted_after_caching(base_app, example_data):
+    dataset = Dataset.get_by_dataset_id("dataset-1")
+    assert dataset.record is not None
+
+    dataset.record.delete()
+
+    assert dataset.record is None
+    assert not dataset.has_record
+    assert dataset.is_zombie
+
+
+def test_get_zombies_none(base_app, example_data):
+    zombies = Dataset.get_zombies()
+
+    assert zombies == []
+
+
+def test_get_orphans_include_zombies(base_app, example_data):
+    orphan = Dataset.create("dataset-orphan", None)
+
+    assert Dataset.get_orphans(include_zombies=True) == [orphan]
+
+
 # --------------------->
 # Data Management Plans
 # --------------------->
@@ -98,6 +194,36 @@ def test_find_dmp_by_id_nonexisting(base_app, example_data):
     assert dmp is None
 
 
+def test_dmp_exists(base_app, example_data):
+    assert DataManagementPlan.dmp_exists("dmp-1")
+    assert not DataManagementPlan.dmp_exists("non-existing")
+
+
+def test_create_many_dmps(base_app, example_data):
+    datasets = example_data["datasets"]
+    dmps = DataManagementPlan.create_many(
+        [
+            {"dmp_id": "new-dmp-1", "datasets": datasets[:2]},
+            {"dmp_id": "new-dmp-2"},
+        ]
+    )
+
+    assert [dmp.dmp_id for dmp in dmps] == ["new-dmp-1", "new-dmp-2"]
+    assert DataManagementPlan.get_by_dmp_id("new-dmp-1") is dmps[0]
+    assert DataManagementPlan.get_by_dmp_id("new-dmp-2") is dmps[1]
+    assert len(dmps[0].datasets) == 2
+    assert not dmps[1].datasets
+
+
+def test_ids_assigned_on_construction(base_app):
+    dmp = DataManagementPlan(dmp_id="new-dmp")
+    dataset = Dataset(dataset_id="new-dataset")
+
+    assert dmp.id is not None
+    assert dataset.id is not None
+    assert dmp.id != dataset.id
+
+
 def test_find_dmps_by_record(base_app, example_data):
     for dataset in example_data["used_datasets"]:
         rec = dataset.record
@@ -141,26 +267,234 @@ def test_find_dmps_by_record_pid_unused(base_app, example_data):
         assert not dmps
 
 
+def test_delete_dmp(base_app, example_data):
+    dmp = DataManagementPlan.get_by_dmp_id("dmp-2")
+    datasets = dmp.datasets
+    assert datasets
+
+    dmp.delete()
+
+    assert DataManagementPlan.get_by_dmp_id("dmp-2") is None
+    for ds in datasets:
+        assert Dataset.get_by_dataset_id(ds.dataset_id) is not None
+        assert "dmp-2" not in [dmp.dmp_id for dmp in ds.dmps]
+
+
+def test_add_and_remove_dataset(base_app, example_data):
+    dmp = DataManagementPlan.get_by_dmp_id("dmp-1")
+    dataset = example_data["unused_datasets"][0]
+    assert not dmp.has_dataset(dataset)
+
+    dmp.add_dataset(dataset)
+    dmp.add_dataset(dataset)
+    assert dmp.has_dataset(dataset)
+    assert len([ds for ds in dmp.datasets if ds is dataset]) == 1
+
+    dmp.remove_dataset(dataset)
+    dmp.remove_dataset(dataset)
+    assert not dmp.has_dataset(dataset)
+
+
+def test_add_and_remove_datasets(base_app, example_data):
+    dmp = DataManagementPlan.get_by_dmp_id("dmp-4")
+    datasets = example_data["datasets"]
+
+    dmp.add_datasets(datasets)
+    assert len(dmp.datasets) == len(datasets)
+    for dataset in datasets:
+        assert dmp.has_dataset(dataset)
+
+    dmp.remove_datasets(datasets[:3])
+    assert len(dmp.datasets) == len(datasets) - 3
+    for dataset in datasets[:3]:
+        assert not dmp.has_dataset(dataset)
+
+    db.session.commit()
+
+
+def test_dmp_changed_signal_after_commit(base_app, example_data, dmp_changes):
+    dmp = DataManagementPlan.get_by_dmp_id("dmp-1")
+    dataset = example_data["unused_datasets"][0]
+
+    dmp.add_dataset(dataset)
+    assert not dmp_changes
+
+    db.session.commit()
+    assert dmp_changes == [(dmp, {"new_dataset": dataset})]
+
+
+def test_duplicate_signals_sent_once(base_app, example_data, dmp_changes):
+    dmp = DataManagementPlan.get_by_dmp_id("dmp-1")
+    dataset = example_data["unused_datasets"][0]
+
+    send_after_commit(dmp_changed, dmp, new_dataset=dataset)
+    send_after_commit(dmp_changed, dmp, new_dataset=dataset)
+    db.session.commit()
+    assert dmp_changes == [(dmp, {"new_dataset": dataset})]
+
+
+def test_reapplied_change_signalled_last(base_app, example_data, dmp_changes):
+    dmp = DataManagementPlan.get_by_dmp_id("dmp-1")
+    dataset = example_data["unused_datasets"][0]
+
+    dmp.add_dataset(dataset)
+    dmp.remove_dataset(dataset)
+    dmp.add_dataset(dataset)
+    db.session.commit()
+
+    assert dmp.has_dataset(dataset)
+    assert dmp_changes == [
+        (dmp, {"removed_dataset": dataset}),
+        (dmp, {"new_dataset": dataset}),
+    ]
+
+
+def test_signal_receiver_can_query(base_app, example_data):
+    received = []
+
+    def receiver(sender, **kwargs):
+        # the DMP's attributes have been expired by the commit
+        received.append(
+            (sorted(ds.dataset_id for ds in sender.datasets), Dataset.query.count())
+        )
+
+    dmp = DataManagementPlan.get_by_dmp_id("dmp-1")
+    dataset = example_data["unused_datasets"][0]
+
+    with dmp_changed.connected_to(receiver):
+        dmp.add_dataset(dataset)
+        db.session.commit()
+
+    num_datasets = len(example_data["datasets"])
+    assert received == [(["dataset-1", "dataset-7"], num_datasets)]
+
+
+def test_failed_savepoint_keeps_outer_signals(base_app, example_data, dmp_changes):
+    dmp = DataManagementPlan.get_by_dmp_id("dmp-1")
+    dataset = example_data["unused_datasets"][0]
+
+    send_after_commit(dmp_changed, dmp, new_dataset=dataset)
+
+    with pytest.raises(IntegrityError):
+        DataManagementPlan.create("dmp-1")
+
+    with pytest.raises(RuntimeError):
+        with db.session.begin_nested():
+            send_after_commit(dmp_changed, dmp, removed_dataset=dataset)
+            raise RuntimeError("rolling back the savepoint")
+
+    db.session.commit()
+    assert dmp_changes == [(dmp, {"new_dataset": dataset})]
+
+
+def test_signal_from_receiver_not_lost(base_app, example_data):
+    received = []
+
+    def dmp_receiver(sender, **kwargs):
+        for dataset in kwargs.get("new_datasets", []):
+            send_after_commit(dataset_changed, dataset)
+
+    def dataset_receiver(sender, **kwargs):
+        received.append(sender)
+
+    dmp = DataManagementPlan.get_by_dmp_id("dmp-1")
+    dataset = example_data["unused_datasets"][0]
+
+    with dmp_changed.connected_to(dmp_receiver):
+        with dataset_changed.connected_to(dataset_receiver):
+            dmp.add_datasets([dataset])
+            db.session.commit()
+            assert received == [dataset]
+
+
+def test_other_sessions_not_watched(base_app):
+    session = Session(bind=db.engine)
+    try:
+        session.execute("SELECT 1")
+        session.commit()
+        assert not session.info
+    finally:
+        session.close()
+
+
 # ========== #
 # Conversion #
 # ========== #
 
 
 def test_successful_conversion(
-    base_app, example_madmps_for_invenio, all_required_accounts
+    base_app, example_madmps_for_invenio, all_required_accounts, madmp_name
 ):
-    for _, madmp in example_madmps_for_invenio.items():
-        dmp = convert_dmp(madmp["dmp"])
+    madmp = example_madmps_for_invenio[madmp_name]
+    dmp = convert_dmp(madmp["dmp"])
+
+    assert dmp is not None
+    assert dmp.dmp_id == madmp["dmp"]["dmp_id"]["identifier"]
+
+
+def test_no_users(
+    base_app, db_session, example_madmps_for_invenio_requiring_users, madmp_name
+):
+    assert db.session.query(User.id).first() is None
+
+    madmp = example_madmps_for_invenio_requiring_users[madmp_name]
+    with pytest.raises(LookupError):
+        convert_dmp(madmp["dmp"])
+
+
+# ======== #
+# REST API #
+# ======== #
+
+
+def test_list_dmps_query_count(base_app, example_data):
+    client = base_app.test_client()
+    token = base_app.config["MADMP_COMMUNICATION_TOKEN"]
+    headers = {"Authorization": "Bearer %s" % token}
+
+    db.session.expunge_all()
+    with count_queries() as queries:
+        res = client.get("/dmps", headers=headers)
+        # the response is streamed, i.e. only generated while it's being read
+        res.get_data()
+
+    assert res.status_code == 200
+    assert len(res.json) == 4
+    assert queries
+
+    # the number of queries must not grow with the number of DMPs and datasets
+    DataManagementPlan.create("dmp-5", Dataset.get_by_dataset_id("dataset-7"))
+    db.session.expunge_all()
+    with count_queries() as more_queries:
+        res = client.get("/dmps", headers=headers)
+        # the response is streamed, i.e. only generated while it's being read
+        res.get_data()
+
+    assert res.status_code == 200
+    assert len(res.json) == 5
+    assert len(more_queries) == len(queries)
+
+
+def test_list_dmps_without_details(base_app, example_data):
+    client = base_app.test_client()
+    token = base_app.config["MADMP_COMMUNICATION_TOKEN"]
+    headers = {"Authorization": "Bearer %s" % token}
+
+    res = client.get("/dmps?detail=short", headers=headers)
+
+    assert res.status_code == 200
+    dmp_1 = next(dmp for dmp in res.json if dmp["dmp_id"] == "dmp-1")
+    dataset = example_data["datasets"][0]
+    assert dmp_1["datasets"] == [
+        {"dataset_id": dataset.dataset_id, "record_pid": dataset.record_pid.pid_value}
+    ]
 
-        assert dmp is not None
-        assert dmp.dmp_id == madmp["dmp"]["dmp_id"]["identifier"]
 
+def test_list_dmps_invalid_detail(base_app, example_data):
+    client = base_app.test_client()
+    token = base_app.config["MADMP_COMMUNICATION_TOKEN"]
+    headers = {"Authorization": "Bearer %s" % token}
 
-def test_no_users(base_app, example_madmps_for_invenio_requiring_users):
-    assert len(User.query.all()) == 0
+    res = client.get("/dmps?detail=ful", headers=headers)
 
-    problematic_madmps = example_madmps_for_invenio_requiring_users
-    for madmp in problematic_madmps:
-        with pytest.raises(LookupError):
-            madmp = problematic_madmps[madmp]["dmp"]
-            convert_dmp(madmp)
+    assert res.status_code == 400